@@ -233,7 +233,7 @@ deploy_lambda_function() {
         log_info "Creating new Lambda function: $function_name"
         aws lambda create-function \
             --function-name "$function_name" \
-            --runtime python3.11 \
+            --runtime python3.12 \
             --role "$role_arn" \
             --handler lambda_function.lambda_handler \
             --zip-file "fileb://$package_path" \
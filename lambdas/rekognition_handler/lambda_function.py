@@ -6,12 +6,66 @@ to detect accessibility-relevant labels in home environments.
 import json
 import boto3
 import logging
-from typing import Dict, Any, List
+import os
+import time
+from typing import Dict, Any, List, Tuple
+from botocore.config import Config
 
 # Configure CloudWatch logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# Client configuration: keep TCP connections alive so warm invocations
+# reuse the TLS session instead of paying a fresh handshake per call
+BOTO_CONFIG = Config(
+    tcp_keepalive=True,
+    retries={'max_attempts': 3, 'mode': 'standard'},
+    max_pool_connections=10
+)
+
+# Initialize AWS clients once at module scope so warm invocations reuse them
+# (Lambda sets AWS_REGION; the fallback keeps local test imports working)
+rekognition_client = boto3.client(
+    'rekognition',
+    region_name=os.environ.get('AWS_REGION', 'us-east-1'),
+    config=BOTO_CONFIG
+)
+
+# Warm the client during the Lambda init phase: a cheap API call forces
+# credential resolution and establishes the TLS connection so the first
+# real invocation skips that latency
+if os.environ.get('AWS_LAMBDA_FUNCTION_NAME'):
+    try:
+        rekognition_client.describe_projects(MaxResults=1)
+    except Exception:
+        pass
+
+# Error responses with constant bodies, serialized once at module load
+# so the failure paths skip json.dumps entirely
+_RESP_400_MISSING_BUCKET = {
+    'statusCode': 400,
+    'body': json.dumps({'error': 'Missing bucket in event'})
+}
+_RESP_400_MISSING_KEY = {
+    'statusCode': 400,
+    'body': json.dumps({'error': 'Missing key in event'})
+}
+
+# Short-TTL in-process cache of detect_labels results keyed by
+# (bucket, key). Retries and re-invocations for the same image within a
+# warm sandbox skip the Rekognition call (~500ms and billed per image).
+_RESULT_CACHE: Dict[Tuple[str, str], Tuple[List[Dict[str, Any]], float]] = {}
+_RESULT_CACHE_TTL_SECONDS = 300
+_RESULT_CACHE_MAX_ENTRIES = 256
+
+# Accessibility-relevant keywords, built once at module scope so warm
+# invocations do not rebuild the set per call
+ACCESSIBILITY_KEYWORDS = frozenset({
+    'stairs', 'ramp', 'door', 'doorway', 'bathroom', 'bedroom',
+    'kitchen', 'hallway', 'entrance', 'elevator', 'lift',
+    'wheelchair', 'grab bar', 'handrail', 'step', 'threshold'
+})
+
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     Lambda handler for detecting accessibility-relevant labels in images.
@@ -24,9 +78,11 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         Dict containing detected labels and image key
     """
     try:
-        # Log the incoming event for debugging
-        logger.info(f"Processing event: {json.dumps(event)}")
-        
+        # Avoid serializing the whole event at INFO level; the bucket/key
+        # are logged below once validated
+        logger.info("Processing Rekognition event")
+
+
         # Extract image data from event
         bucket_name = event.get('bucket')
         image_key = event.get('key')
@@ -34,34 +90,21 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         # Validate required parameters
         if not bucket_name:
             logger.error("Missing 'bucket' in event")
-            return {
-                'statusCode': 400,
-                'body': json.dumps({'error': 'Missing bucket in event'})
-            }
-        
+            return _RESP_400_MISSING_BUCKET
+
         if not image_key:
             logger.error("Missing 'key' in event")
-            return {
-                'statusCode': 400,
-                'body': json.dumps({'error': 'Missing key in event'})
-            }
+            return _RESP_400_MISSING_KEY
         
         logger.info(f"Processing image: s3://{bucket_name}/{image_key}")
         
-        # Initialize Rekognition client
-        rekognition = boto3.client('rekognition')
-        
-        # Call Rekognition to detect labels
-        response = rekognition.detect_labels(
-            Image={'S3Object': {'Bucket': bucket_name, 'Name': image_key}},
-            MaxLabels=50,
-            MinConfidence=70
-        )
-        
-        logger.info(f"Rekognition detected {len(response.get('Labels', []))} labels")
-        
+        # Call Rekognition to detect labels (cached per bucket/key)
+        labels = detect_labels_cached(bucket_name, image_key)
+
+        logger.info(f"Rekognition detected {len(labels)} labels")
+
         # Filter labels for accessibility-relevant ones
-        accessibility_labels = filter_accessibility_labels(response.get('Labels', []))
+        accessibility_labels = filter_accessibility_labels(labels)
         
         logger.info(f"Found {len(accessibility_labels)} accessibility-relevant labels")
         
@@ -84,6 +127,37 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             })
         }
 
+def detect_labels_cached(bucket_name: str, image_key: str) -> List[Dict[str, Any]]:
+    """
+    Detect labels for an image, reusing recent results for the same object.
+
+    Args:
+        bucket_name: S3 bucket name
+        image_key: S3 object key
+
+    Returns:
+        List of labels from Rekognition
+    """
+    cache_key = (bucket_name, image_key)
+    cached = _RESULT_CACHE.get(cache_key)
+    if cached and time.time() - cached[1] < _RESULT_CACHE_TTL_SECONDS:
+        logger.info(f"Cache hit for s3://{bucket_name}/{image_key}")
+        return cached[0]
+
+    response = rekognition_client.detect_labels(
+        Image={'S3Object': {'Bucket': bucket_name, 'Name': image_key}},
+        MaxLabels=50,
+        MinConfidence=70
+    )
+    labels = response.get('Labels', [])
+
+    # Bounded cache; drop everything rather than tracking LRU order
+    if len(_RESULT_CACHE) >= _RESULT_CACHE_MAX_ENTRIES:
+        _RESULT_CACHE.clear()
+    _RESULT_CACHE[cache_key] = (labels, time.time())
+
+    return labels
+
 def filter_accessibility_labels(labels: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
     Filter labels to only include accessibility-relevant ones.
@@ -94,13 +168,6 @@ def filter_accessibility_labels(labels: List[Dict[str, Any]]) -> List[Dict[str,
     Returns:
         List of filtered accessibility-relevant labels
     """
-    # Define accessibility-relevant keywords
-    accessibility_keywords = {
-        'stairs', 'ramp', 'door', 'doorway', 'bathroom', 'bedroom', 
-        'kitchen', 'hallway', 'entrance', 'elevator', 'lift', 
-        'wheelchair', 'grab bar', 'handrail', 'step', 'threshold'
-    }
-    
     filtered_labels = []
     
     for label in labels:
@@ -108,7 +175,7 @@ def filter_accessibility_labels(labels: List[Dict[str, Any]]) -> List[Dict[str,
         confidence = label.get('Confidence', 0)
         
         # Check if label name contains any accessibility keywords
-        if any(keyword in label_name for keyword in accessibility_keywords):
+        if any(keyword in label_name for keyword in ACCESSIBILITY_KEYWORDS):
             filtered_labels.append({
                 'name': label.get('Name'),
                 'confidence': round(confidence, 2),
@@ -137,6 +137,53 @@ class TestPresignedUrlFunction:
         assert sanitize_filename('') != ''
         assert sanitize_filename('_') != '_'
     
+    def test_lambda_handler_batch(self):
+        """Test batch presigned URL generation."""
+        event = {
+            'files': [
+                {'filename': 'house1.jpg', 'content_type': 'image/jpeg'},
+                {'filename': 'house2.png', 'content_type': 'image/png'},
+                {'filename': 'document.pdf', 'content_type': 'application/pdf'}
+            ]
+        }
+
+        context = MagicMock()
+        context.aws_request_id = 'test-request-id'
+
+        with patch('lambdas.presigned_url.lambda_function.s3_client') as mock_s3_client:
+            mock_s3_client.generate_presigned_post.return_value = {
+                'url': 'https://test-bucket.s3.amazonaws.com/',
+                'fields': {'Content-Type': 'image/jpeg'}
+            }
+
+            response = lambda_handler(event, context)
+
+        assert response['statusCode'] == 200
+        body = json.loads(response['body'])
+        assert len(body['urls']) == 3
+
+        # Valid entries get presigned data
+        for result in body['urls'][:2]:
+            assert 'upload_url' in result
+            assert result['key'].startswith('uploads/')
+            assert result['expires_in'] == 300
+
+        # Invalid entries get a per-file error without failing the batch
+        assert 'error' in body['urls'][2]
+
+    def test_lambda_handler_batch_invalid(self):
+        """Test batch request with a non-list files value."""
+        event = {'files': 'not-a-list'}
+
+        context = MagicMock()
+        context.aws_request_id = 'test-request-id'
+
+        response = lambda_handler(event, context)
+
+        assert response['statusCode'] == 400
+        body = json.loads(response['body'])
+        assert 'error' in body
+
     @mock_s3
     def test_lambda_handler_s3_error(self):
         """Test handler with S3 error."""
@@ -13,6 +13,7 @@ import boto3
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+from lambdas.rekognition_handler import lambda_function
 from lambdas.rekognition_handler.lambda_function import (
     lambda_handler,
     filter_accessibility_labels
@@ -24,6 +25,8 @@ class TestRekognitionHandler:
     def setup_method(self):
         """Set up test fixtures."""
         os.environ['AWS_REGION'] = 'us-east-1'
+        # Clear the warm-invocation result cache between tests
+        lambda_function._RESULT_CACHE.clear()
     
     def teardown_method(self):
         """Clean up after tests."""
@@ -33,9 +36,8 @@ class TestRekognitionHandler:
     @mock_rekognition
     def test_lambda_handler_success(self):
         """Test successful Rekognition processing."""
-        # Mock Rekognition response
-        with patch('boto3.client') as mock_client:
-            mock_rekognition = MagicMock()
+        # Mock the module-level Rekognition client
+        with patch('lambdas.rekognition_handler.lambda_function.rekognition_client') as mock_rekognition:
             mock_rekognition.detect_labels.return_value = {
                 'Labels': [
                     {'Name': 'Stairs', 'Confidence': 95.5},
@@ -45,8 +47,7 @@ class TestRekognitionHandler:
                     {'Name': 'Furniture', 'Confidence': 78.3}
                 ]
             }
-            mock_client.return_value = mock_rekognition
-            
+
             event = {
                 'bucket': 'test-bucket',
                 'key': 'test-image.jpg'
@@ -102,11 +103,9 @@ class TestRekognitionHandler:
     
     def test_lambda_handler_rekognition_error(self):
         """Test handler with Rekognition error."""
-        with patch('boto3.client') as mock_client:
-            mock_rekognition = MagicMock()
+        with patch('lambdas.rekognition_handler.lambda_function.rekognition_client') as mock_rekognition:
             mock_rekognition.detect_labels.side_effect = Exception("Rekognition error")
-            mock_client.return_value = mock_rekognition
-            
+
             event = {
                 'bucket': 'test-bucket',
                 'key': 'test-image.jpg'
@@ -188,12 +187,12 @@ class TestRekognitionHandler:
         
         context = MagicMock()
         
-        # Mock boto3 to raise exception
-        with patch('boto3.client') as mock_client:
-            mock_client.side_effect = Exception("AWS error")
-            
+        # Mock the module-level client to raise exception
+        with patch('lambdas.rekognition_handler.lambda_function.rekognition_client') as mock_rekognition:
+            mock_rekognition.detect_labels.side_effect = Exception("AWS error")
+
             response = lambda_handler(event, context)
-            
+
             assert response['statusCode'] == 500
             body = json.loads(response['body'])
             assert 'error' in body
@@ -13,18 +13,172 @@ Author: AI Assistant
 """
 
 import requests
+import hashlib
 import json
 import re
 import os
 import sys
 import argparse
 import boto3
+import threading
 import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urljoin
 from bs4 import BeautifulSoup
+from botocore.config import Config
 from botocore.exceptions import ClientError, NoCredentialsError
 
+# Prefer lxml's C parser for the multi-MB listing pages; fall back to
+# the stdlib parser when lxml isn't installed
+try:
+    import lxml  # noqa: F401
+    _BS_PARSER = 'lxml'
+except ImportError:
+    _BS_PARSER = 'html.parser'
+
+# orjson parses the multi-MB state blobs several times faster than the
+# stdlib; both raise ValueError subclasses on bad input. raw_decode has
+# no orjson equivalent, so the incremental scans stay on stdlib json.
+try:
+    import orjson
+
+    def _json_loads(text):
+        # orjson rejects str subclasses like bs4's NavigableString;
+        # str() on an exact str is a no-op, so this costs nothing there
+        return orjson.loads(str(text))
+except ImportError:
+    _json_loads = json.loads
+
+
+# Precompiled regex patterns. These run on every page and every URL the
+# scraper touches, so compile them once at import instead of per call.
+
+# Substrings that mark an embedded JSON state blob; the value after each
+# sentinel is decoded with raw_decode, which handles nested braces and
+# string literals that a non-greedy regex would stop at. Ordered by how
+# often each shows up on real listing pages.
+_JSON_STATE_SENTINELS = (
+    'window.__INITIAL_STATE__',
+    '"photoGallery":',
+    '"images":',
+    'window.__APP_STATE__',
+    '"photos":',
+)
+# is_image_url is the hot inner loop over every string in a page's JSON
+# tree: one set lookup on the trailing extension, with a single compiled
+# alternation as the fallback for extensions buried mid-URL
+_IMG_EXTS = frozenset({'jpg', 'jpeg', 'png', 'gif', 'webp', 'bmp', 'tiff'})
+_IMG_URL_RE = re.compile(r'\.(?:jpe?g|png|gif|webp|bmp|tiff)(?:[?#/]|$)', re.IGNORECASE)
+_EXCLUDE_URL_PATTERNS = (
+    re.compile(r'noScript\.gif'),
+    re.compile(r'tracking'),
+    re.compile(r'analytics'),
+    re.compile(r'pixel'),
+    re.compile(r'beacon'),
+    re.compile(r'logo'),
+    re.compile(r'icon'),
+    re.compile(r'favicon'),
+    re.compile(r'amenities'),
+    re.compile(r'common.*area'),
+    re.compile(r'lobby'),
+    re.compile(r'pool'),
+    re.compile(r'gym'),
+    re.compile(r'fitness'),
+)
+_PROPERTY_PHOTO_PATTERNS = (
+    re.compile(r'-cc_ft_\d+\.(jpg|webp|png)'),
+    re.compile(r'-o_a\.(jpg|webp|png)'),
+    re.compile(r'-r_b\.(jpg|webp|png)'),
+    re.compile(r'-p_d\.(jpg|webp|png)'),
+    re.compile(r'-p_i\.(jpg|webp|png)'),
+)
+_ZPHOTO_PATTERNS = (
+    re.compile(r'https://photos\.zillowstatic\.com/fp/([a-f0-9]{32})-cc_ft_\d+\.(jpg|webp|png)'),
+    re.compile(r'https://photos\.zillowstatic\.com/fp/([a-f0-9]{32})-o_a\.(jpg|webp|png)'),
+    re.compile(r'https://photos\.zillowstatic\.com/fp/([a-f0-9]{32})-r_b\.(jpg|webp|png)'),
+    re.compile(r'https://photos\.zillowstatic\.com/fp/([a-f0-9]{32})-p_d\.(jpg|webp|png)'),
+    re.compile(r'https://photos\.zillowstatic\.com/fp/([a-f0-9]{32})-p_i\.(jpg|webp|png)'),
+)
+_SRCSET_URL_RE = re.compile(r'([^\s,]+)')
+_BG_URL_RE = re.compile(r'background-image:\s*url\(["\']?([^"\']+)["\']?\)')
+_BASE_ID_RE = re.compile(r'/([a-f0-9]{32})-cc_ft_\d+\.(jpg|webp|png)')
+_RES_RE = re.compile(r'-cc_ft_(\d+)\.')
+_ZPID_RE = re.compile(r'/(\d+)_zpid/')
+
+# JSON keys whose list values hold image entries, and the URL fields to
+# pull from those entries. Lowercase to match the key.lower() comparison
+# ('photoGallery' with a capital G could never match before)
+_IMAGE_CONTAINER_KEYS = frozenset({'photogallery', 'images', 'photos', 'pictures'})
+_IMAGE_URL_FIELDS = ('url', 'href', 'src', 'imageUrl', 'photoUrl')
+
+# img attributes that may carry the image source, in priority order
+_SRC_ATTRS = ('src', 'data-src', 'data-lazy-src', 'data-original', 'data-srcset')
+
+# Shared decoder for incremental JSON scans
+_JSON_DECODER = json.JSONDecoder()
+
+# Base for resolving protocol-relative and path-relative image URLs
+_ZILLOW_BASE = 'https://www.zillow.com/'
+
+
+def _basename(url):
+    """Extract the trailing filename from a URL without urlparse overhead."""
+    return url.rsplit('/', 1)[-1].split('?', 1)[0].split('#', 1)[0]
+
+
+def _absolutize(url):
+    """Resolve a possibly relative URL against the Zillow origin."""
+    # urljoin is C-backed and also handles '../x.jpg' forms the old
+    # startswith('//')/startswith('/') branches missed
+    if url.startswith('http'):
+        return url
+    return urljoin(_ZILLOW_BASE, url)
+
+
+def _decode_json_after(text, start):
+    """
+    Decode the first JSON value ('{' or '[') found at or after ``start``.
+
+    Skips the ``=``/``:`` and whitespace between a state sentinel and its
+    value; returns the decoded object, or None if no value parses.
+    """
+    limit = min(start + 64, len(text))
+    for i in range(start, limit):
+        char = text[i]
+        if char == '{' or char == '[':
+            try:
+                obj, _ = _JSON_DECODER.raw_decode(text, i)
+                return obj
+            except ValueError:
+                return None
+        if char not in ' \t\r\n=:':
+            return None
+    return None
+
+
+def _iter_json_objects(text):
+    """
+    Yield every standalone JSON object or array embedded in ``text``.
+
+    Walks the string with raw_decode from each '{'/'[' sentinel: near
+    linear, handles arbitrary nesting, and immune to the backtracking
+    blowups of a brace-matching regex.
+    """
+    i, n = 0, len(text)
+    while i < n:
+        char = text[i]
+        if char == '{' or char == '[':
+            try:
+                obj, end = _JSON_DECODER.raw_decode(text, i)
+                yield obj
+                i = end
+                continue
+            except ValueError:
+                pass
+        i += 1
+
 
 def get_headers():
     """
@@ -60,39 +214,77 @@ def get_headers():
     }
 
 
+# Shared HTTP session with a connection pool: every image on a listing
+# comes from photos.zillowstatic.com, so reusing the TCP+TLS connection
+# avoids a fresh handshake per download. The User-Agent is chosen once
+# per process; rotating it per request would break keep-alive reuse.
+_SESSION = requests.Session()
+_SESSION.headers.update(get_headers())
+# Send the browser-like Referer/Origin on every request rather than only
+# on a manual 403 retry; the first attempt was wasted otherwise
+_SESSION.headers.update({
+    'Referer': 'https://www.zillow.com/',
+    'Origin': 'https://www.zillow.com'
+})
+# 403 is in the retry list because Zillow's anti-bot layer issues
+# transient 403s; the Retry backoff keeps the pooled connection alive
+# instead of re-handshaking per attempt
+_ADAPTER = requests.adapters.HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=32,
+    max_retries=requests.adapters.Retry(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=[403, 429, 500, 502, 503, 504],
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=True
+    )
+)
+_SESSION.mount('https://', _ADAPTER)
+_SESSION.mount('http://', _ADAPTER)
+
+# Concurrent downloads per listing; keep below the adapter's pool_maxsize
+# so pooled connections are reused rather than thrashed
+MAX_DOWNLOAD_WORKERS = int(os.getenv('ZSCRAPE_WORKERS', '12'))
+
+
+# Process-lifetime cache of fetched pages keyed by URL. The Flask app
+# calls fetch_page_content per request, and refetching the same listing
+# is expensive under Zillow's anti-bot backoff. Failures are not cached
+# so a retry after a transient error actually refetches.
+_PAGE_CACHE = {}
+_PAGE_CACHE_MAX_ENTRIES = 256
+
+
 def fetch_page_content(url):
     """
     Fetch the content of a Zillow listing page.
-    
+
     Args:
         url (str): The Zillow listing URL
-        
+
     Returns:
         str: Page content as HTML string, or None if request fails
     """
+    cached = _PAGE_CACHE.get(url)
+    if cached is not None:
+        print(f"Using cached page: {url}")
+        return cached
+
     try:
         print(f"Fetching page: {url}")
-        
-        # Create a session to maintain cookies
-        session = requests.Session()
-        
-        # First, try to get the main page with shorter timeout
-        response = session.get(url, headers=get_headers(), timeout=10)
-        
-        # If we get a 403, try with a different approach
-        if response.status_code == 403:
-            print("Got 403, trying with different headers...")
-            # Add more realistic headers
-            headers = get_headers()
-            headers.update({
-                'Referer': 'https://www.zillow.com/',
-                'Origin': 'https://www.zillow.com'
-            })
-            response = session.get(url, headers=headers, timeout=10)
-        
+
+        # The adapter's Retry handles 403/429/5xx with backoff, so one
+        # call is enough here
+        response = _SESSION.get(url, timeout=10)
         response.raise_for_status()
+
+        # Simple bound: drop everything rather than tracking recency
+        if len(_PAGE_CACHE) >= _PAGE_CACHE_MAX_ENTRIES:
+            _PAGE_CACHE.clear()
+        _PAGE_CACHE[url] = response.text
         return response.text
-        
+
     except requests.exceptions.RequestException as e:
         print(f"Error fetching page: {e}")
         print("This might be due to Zillow's anti-bot protection.")
@@ -100,75 +292,67 @@ def fetch_page_content(url):
         return None
 
 
-def extract_json_from_page(html_content):
+def extract_json_from_page(html_content, soup=None):
     """
     Extract JSON data containing image information from the page HTML.
-    
+
     Args:
         html_content (str): HTML content of the page
-        
+        soup (BeautifulSoup): Optional pre-parsed soup to reuse
+
     Returns:
         dict: Parsed JSON data, or None if not found
     """
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
+        if soup is None:
+            soup = BeautifulSoup(html_content, _BS_PARSER)
+
+        # Single tree sweep; all three extraction methods iterate this list
+        script_tags = soup.find_all('script')
+
         # Method 1: Look for script tags with application/json type
-        script_tags = soup.find_all('script', type='application/json')
         for script in script_tags:
+            if script.get('type') != 'application/json':
+                continue
             try:
-                json_data = json.loads(script.string)
+                json_data = _json_loads(script.string)
                 if 'photoGallery' in json_data or 'images' in json_data:
                     return json_data
-            except (json.JSONDecodeError, AttributeError):
+            except (ValueError, AttributeError, TypeError):
                 continue
-        
-        # Method 2: Look for all script tags and search for JSON patterns (optimized)
-        script_tags = soup.find_all('script')
+
+        # Method 2: Look for state-blob sentinels and decode the value
+        # after each one incrementally (most common sentinels first)
         for script in script_tags:
             if script.string:
                 script_content = script.string
-                
-                # Look for the most common patterns first (optimized order)
-                patterns = [
-                    r'window\.__INITIAL_STATE__\s*=\s*({.*?});',
-                    r'"photoGallery":\s*(\[.*?\])',
-                    r'"images":\s*(\[.*?\])',
-                    r'window\.__APP_STATE__\s*=\s*({.*?});',
-                    r'"photos":\s*(\[.*?\])'
-                ]
-                
-                for pattern in patterns:
-                    matches = re.findall(pattern, script_content, re.DOTALL)
-                    for match in matches:
-                        try:
-                            if match.startswith('{'):
-                                json_data = json.loads(match)
-                                if 'photoGallery' in json_data or 'images' in json_data or 'photos' in json_data:
-                                    return json_data
-                            elif match.startswith('['):
-                                # It's an array, wrap it in an object
-                                json_data = json.loads(match)
-                                if isinstance(json_data, list) and len(json_data) > 0:
-                                    # Check if it looks like image data
-                                    if any(isinstance(item, dict) and ('url' in item or 'href' in item or 'src' in item) for item in json_data):
-                                        return {'images': json_data}
-                        except json.JSONDecodeError:
-                            continue
-        
-        # Method 3: Look for any JSON that might contain image URLs
-        all_scripts = soup.find_all('script')
-        for script in all_scripts:
-            if script.string and ('photo' in script.string.lower() or 'image' in script.string.lower()):
-                # Try to find any JSON structure
-                json_matches = re.findall(r'\{[^{}]*(?:"url"|"href"|"src"|"photo"|"image")[^{}]*\}', script.string)
-                for match in json_matches:
-                    try:
-                        json_data = json.loads(match)
+
+                for sentinel in _JSON_STATE_SENTINELS:
+                    idx = script_content.find(sentinel)
+                    while idx != -1:
+                        json_data = _decode_json_after(script_content, idx + len(sentinel))
+                        if isinstance(json_data, dict):
+                            if 'photoGallery' in json_data or 'images' in json_data or 'photos' in json_data:
+                                return json_data
+                        elif isinstance(json_data, list) and len(json_data) > 0:
+                            # It's an array; check if it looks like image data
+                            if any(isinstance(item, dict) and ('url' in item or 'href' in item or 'src' in item) for item in json_data):
+                                return {'images': json_data}
+                        idx = script_content.find(sentinel, idx + len(sentinel))
+
+        # Method 3: Look for any JSON that might contain image URLs.
+        # Prescreen with one lowered copy per script; lowering twice
+        # doubled the scan cost on MB-sized scripts
+        for script in script_tags:
+            script_content = script.string
+            if not script_content:
+                continue
+            lowered = script_content.lower()
+            if 'photo' in lowered or 'image' in lowered:
+                for json_data in _iter_json_objects(script_content):
+                    if isinstance(json_data, dict):
                         if any(key in json_data for key in ['url', 'href', 'src', 'photo', 'image']):
                             return json_data
-                    except json.JSONDecodeError:
-                        continue
         
         return None
         
@@ -187,34 +371,39 @@ def extract_image_urls(json_data):
     Returns:
         list: List of image URLs
     """
+    # Iterative traversal: Zillow's state blobs can be MBs of nested
+    # JSON, and an explicit deque avoids per-node Python frame setup
+    # (and the unused path string the old recursive version built)
     image_urls = []
-    
-    def search_for_images(data, path=""):
-        """Recursively search for image URLs in nested JSON data."""
-        if isinstance(data, dict):
+    add_url = image_urls.append
+    stack = deque([json_data])
+
+    while stack:
+        data = stack.pop()
+        data_type = type(data)
+        if data_type is dict:
             for key, value in data.items():
-                if key.lower() in ['photoGallery', 'images', 'photos', 'pictures']:
-                    if isinstance(value, list):
-                        for item in value:
-                            if isinstance(item, dict):
-                                # Look for common image URL fields
-                                for url_field in ['url', 'href', 'src', 'imageUrl', 'photoUrl']:
-                                    if url_field in item and item[url_field]:
-                                        image_urls.append(item[url_field])
-                                # Also check nested structures
-                                search_for_images(item, f"{path}.{key}")
-                    elif isinstance(value, str) and is_image_url(value):
-                        image_urls.append(value)
-                else:
-                    search_for_images(value, f"{path}.{key}")
-        elif isinstance(data, list):
-            for i, item in enumerate(data):
-                search_for_images(item, f"{path}[{i}]")
-        elif isinstance(data, str) and is_image_url(data):
-            image_urls.append(data)
-    
-    search_for_images(json_data)
-    return list(set(image_urls))  # Remove duplicates
+                if key.lower() in _IMAGE_CONTAINER_KEYS and type(value) is list:
+                    for item in value:
+                        if type(item) is dict:
+                            # Look for common image URL fields
+                            for url_field in _IMAGE_URL_FIELDS:
+                                field_value = item.get(url_field)
+                                if field_value:
+                                    add_url(field_value)
+                            # Also check nested structures
+                            stack.append(item)
+                elif type(value) in (dict, list):
+                    stack.append(value)
+                elif type(value) is str and is_image_url(value):
+                    add_url(value)
+        elif data_type is list:
+            stack.extend(data)
+        elif data_type is str and is_image_url(data):
+            add_url(data)
+
+    # Deduplicate in one hash pass while preserving discovery order
+    return list(dict.fromkeys(image_urls))
 
 
 def is_image_url(url):
@@ -229,29 +418,14 @@ def is_image_url(url):
     """
     if not url or not isinstance(url, str):
         return False
-    
-    # Check for common image extensions
-    image_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.tiff']
-    url_lower = url.lower()
-    
-    # Check file extension
-    for ext in image_extensions:
-        if ext in url_lower:
-            return True
-    
-    # Check for common image hosting patterns
-    image_patterns = [
-        r'\.(jpg|jpeg|png|gif|webp|bmp|tiff)',
-        r'zillow.*\.(jpg|jpeg|png|gif|webp)',
-        r'photos.*\.(jpg|jpeg|png|gif|webp)',
-        r'images.*\.(jpg|jpeg|png|gif|webp)'
-    ]
-    
-    for pattern in image_patterns:
-        if re.search(pattern, url_lower):
-            return True
-    
-    return False
+
+    # Fast path: check the trailing extension with one set lookup
+    tail = url.rsplit('.', 1)[-1].split('?', 1)[0].split('#', 1)[0].lower()
+    if tail in _IMG_EXTS:
+        return True
+
+    # Fallback: extension somewhere mid-URL (e.g. before a path segment)
+    return _IMG_URL_RE.search(url) is not None
 
 
 def is_property_image(url):
@@ -270,42 +444,17 @@ def is_property_image(url):
     url_lower = url.lower()
     
     # Filter out non-property images
-    exclude_patterns = [
-        r'noScript\.gif',
-        r'tracking',
-        r'analytics',
-        r'pixel',
-        r'beacon',
-        r'logo',
-        r'icon',
-        r'favicon',
-        r'amenities',
-        r'common.*area',
-        r'lobby',
-        r'pool',
-        r'gym',
-        r'fitness'
-    ]
-    
-    for pattern in exclude_patterns:
-        if re.search(pattern, url_lower):
+    for pattern in _EXCLUDE_URL_PATTERNS:
+        if pattern.search(url_lower):
             return False
-    
+
     # Only include Zillow property photos
     if 'photos.zillowstatic.com/fp/' in url_lower:
         # Check for property photo patterns
-        property_patterns = [
-            r'-cc_ft_\d+\.(jpg|webp|png)',
-            r'-o_a\.(jpg|webp|png)',
-            r'-r_b\.(jpg|webp|png)',
-            r'-p_d\.(jpg|webp|png)',
-            r'-p_i\.(jpg|webp|png)'
-        ]
-        
-        for pattern in property_patterns:
-            if re.search(pattern, url_lower):
+        for pattern in _PROPERTY_PHOTO_PATTERNS:
+            if pattern.search(url_lower):
                 return True
-    
+
     return False
 
 
@@ -322,9 +471,9 @@ def download_image(url, folder_path, filename):
         bool: True if download successful, False otherwise
     """
     try:
-        response = requests.get(url, headers=get_headers(), timeout=30)
+        response = _SESSION.get(url, timeout=30)
         response.raise_for_status()
-        
+
         file_path = os.path.join(folder_path, filename)
         with open(file_path, 'wb') as f:
             f.write(response.content)
@@ -357,25 +506,65 @@ def get_s3_client():
         return None
 
 
-def upload_to_s3(s3_client, image_data, bucket_name, s3_key):
+# Content types by extension; a dict lookup replaces the old ternary,
+# which mislabeled PNGs as WebP
+_S3_CONTENT_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.webp': 'image/webp',
+    '.gif': 'image/gif',
+}
+
+# Prebuilt ExtraArgs per extension so uploads don't allocate a fresh
+# dict per image
+_S3_EXTRA_ARGS = {ext: {'ContentType': ct} for ext, ct in _S3_CONTENT_TYPES.items()}
+_S3_EXTRA_ARGS_DEFAULT = {'ContentType': 'image/jpeg'}
+
+# One S3 client per worker thread: boto3 clients are thread-safe for
+# calls, but sharing one across every upload serializes signing and
+# credential resolution under the GIL; a per-thread client keeps its
+# own HTTPS pool warm with no contention
+_S3_THREAD_LOCAL = threading.local()
+_S3_CONFIG = Config(
+    max_pool_connections=32,
+    tcp_keepalive=True,
+    retries={'max_attempts': 3, 'mode': 'adaptive'}
+)
+
+
+def _thread_s3_client():
+    client = getattr(_S3_THREAD_LOCAL, 'client', None)
+    if client is None:
+        client = boto3.session.Session().client('s3', config=_S3_CONFIG)
+        _S3_THREAD_LOCAL.client = client
+    return client
+
+
+def upload_to_s3(s3_client, fileobj, bucket_name, s3_key):
     """
-    Upload image data to S3.
-    
+    Stream image data to S3.
+
     Args:
         s3_client: S3 client
-        image_data (bytes): Image data
+        fileobj: File-like object yielding the image bytes
         bucket_name (str): S3 bucket name
         s3_key (str): S3 object key
-        
+
     Returns:
         bool: True if upload successful, False otherwise
     """
     try:
-        s3_client.put_object(
-            Bucket=bucket_name,
-            Key=s3_key,
-            Body=image_data,
-            ContentType='image/jpeg' if s3_key.endswith('.jpg') else 'image/webp'
+        # upload_fileobj reads the stream in chunks through the boto3
+        # transfer manager (multipart for large blobs), so the image is
+        # never fully buffered in memory
+        s3_client.upload_fileobj(
+            fileobj,
+            bucket_name,
+            s3_key,
+            ExtraArgs=_S3_EXTRA_ARGS.get(
+                os.path.splitext(s3_key)[1].lower(), _S3_EXTRA_ARGS_DEFAULT
+            )
         )
         return True
     except ClientError as e:
@@ -409,40 +598,49 @@ def download_and_upload_to_s3(image_urls, listing_id, bucket_name=None):
         bucket_name = os.getenv('S3_BUCKET_NAME', 'zillow-images')
     
     print(f"\nDownloading {len(image_urls)} images and uploading to S3...")
-    
-    uploaded_count = 0
-    s3_urls = []
-    
-    for i, url in enumerate(image_urls, 1):
+
+    def process_image(numbered_url):
+        """Download one image and upload it to S3; returns the S3 URL or None."""
+        i, url = numbered_url
         try:
             print(f"Processing image {i}/{len(image_urls)}: {url}")
-            
-            # Download image
-            response = requests.get(url, headers=get_headers(), timeout=30)
-            response.raise_for_status()
-            
-            # Extract filename from URL
-            parsed_url = urlparse(url)
-            filename = os.path.basename(parsed_url.path)
-            
-            if not filename or '.' not in filename:
-                filename = f"image_{i:03d}.jpg"
-            
-            # Create S3 key with listing folder
-            s3_key = f"listings/{listing_id}/{filename}"
-            
-            # Upload to S3
-            if upload_to_s3(s3_client, response.content, bucket_name, s3_key):
-                s3_url = f"https://{bucket_name}.s3.amazonaws.com/{s3_key}"
-                s3_urls.append(s3_url)
-                uploaded_count += 1
-                print(f"✓ Uploaded: {filename}")
-            else:
+
+            # Stream the download straight into S3 instead of buffering
+            # the whole image in memory first
+            with _SESSION.get(url, timeout=30, stream=True) as response:
+                response.raise_for_status()
+
+                # Extract filename from URL
+                filename = _basename(url)
+
+                if not filename or '.' not in filename:
+                    filename = f"image_{i:03d}.jpg"
+
+                # Create S3 key with listing folder
+                s3_key = f"listings/{listing_id}/{filename}"
+
+                # Let urllib3 decode gzip/deflate so S3 stores the raw image
+                response.raw.decode_content = True
+                if upload_to_s3(_thread_s3_client(), response.raw, bucket_name, s3_key):
+                    print(f"✓ Uploaded: {filename}")
+                    return f"https://{bucket_name}.s3.amazonaws.com/{s3_key}"
+
                 print(f"✗ Failed to upload: {filename}")
-                
+
         except Exception as e:
             print(f"✗ Error processing {url}: {e}")
-    
+
+        return None
+
+    # The work is I/O-bound, so fan out across threads sharing the pooled
+    # HTTP session; each worker uploads through its own thread-local S3
+    # client (the up-front client above only probes credentials)
+    with ThreadPoolExecutor(max_workers=MAX_DOWNLOAD_WORKERS) as executor:
+        results = list(executor.map(process_image, enumerate(image_urls, 1)))
+
+    s3_urls = [s3_url for s3_url in results if s3_url]
+    uploaded_count = len(s3_urls)
+
     print(f"\nUploaded {uploaded_count} out of {len(image_urls)} images to S3.")
     
     return {
@@ -473,120 +671,118 @@ def download_all_images(image_urls, folder_name="zillow_images"):
     os.makedirs(folder_name, exist_ok=True)
     
     print(f"\nDownloading {len(image_urls)} images to '{folder_name}/' folder...")
-    
-    downloaded_count = 0
+
+    # Resolve all target filenames up-front so the parallel downloads
+    # below never race on uniqueness checks. One scandir seeds the set
+    # with what's already on disk; collision checks then stay in memory
+    # instead of a stat call per candidate name
+    existing = {entry.name for entry in os.scandir(folder_name)}
+    filenames = []
     for i, url in enumerate(image_urls, 1):
         # Extract filename from URL or create one
-        parsed_url = urlparse(url)
-        filename = os.path.basename(parsed_url.path)
-        
+        filename = _basename(url)
+
         if not filename or '.' not in filename:
             # Create filename if none exists
             filename = f"image_{i:03d}.jpg"
-        
+
         # Ensure unique filename
-        base_name, ext = os.path.splitext(filename)
-        counter = 1
-        original_filename = filename
-        while os.path.exists(os.path.join(folder_name, filename)):
+        if filename in existing:
+            base_name, ext = os.path.splitext(filename)
+            counter = 1
+            while f"{base_name}_{counter}{ext}" in existing:
+                counter += 1
             filename = f"{base_name}_{counter}{ext}"
-            counter += 1
-        
-        if download_image(url, folder_name, filename):
-            downloaded_count += 1
-    
+        existing.add(filename)
+        filenames.append(filename)
+
+    # Fan the I/O-bound downloads out across threads sharing the pooled session
+    with ThreadPoolExecutor(max_workers=MAX_DOWNLOAD_WORKERS) as executor:
+        results = list(executor.map(
+            lambda pair: download_image(pair[0], folder_name, pair[1]),
+            zip(image_urls, filenames)
+        ))
+
+    downloaded_count = sum(1 for success in results if success)
+
     print(f"\nDownloaded {downloaded_count} out of {len(image_urls)} images.")
     return downloaded_count
 
 
-def extract_images_from_html(html_content):
+def extract_images_from_html(html_content, soup=None):
     """
     Extract image URLs directly from HTML content as a fallback method.
-    
+
     Args:
         html_content (str): HTML content of the page
-        
+        soup (BeautifulSoup): Optional pre-parsed soup to reuse
+
     Returns:
         list: List of image URLs found in HTML
     """
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
+        if soup is None:
+            soup = BeautifulSoup(html_content, _BS_PARSER)
+
+        # Dedup inline as URLs are found: one hash lookup per URL keeps
+        # discovery order and skips re-validating repeats from srcset
         image_urls = []
-        
-        # Look for img tags with various attributes
-        img_tags = soup.find_all('img')
-        for img in img_tags:
-            # Check multiple possible source attributes
-            src_attrs = ['src', 'data-src', 'data-lazy-src', 'data-original', 'data-srcset']
-            for attr in src_attrs:
-                src = img.get(attr)
-                if src and is_image_url(src):
-                    # Convert relative URLs to absolute
-                    if src.startswith('//'):
-                        src = 'https:' + src
-                    elif src.startswith('/'):
-                        src = 'https://www.zillow.com' + src
-                    image_urls.append(src)
-                    break  # Only add one source per img tag
-        
-        # Look for picture tags
-        picture_tags = soup.find_all('picture')
-        for picture in picture_tags:
-            sources = picture.find_all('source')
-            for source in sources:
-                srcset = source.get('srcset')
+        seen = set()
+
+        def add_url(url):
+            if url not in seen:
+                seen.add(url)
+                image_urls.append(url)
+
+        # One traversal of the tree routing each element by tag name,
+        # instead of four separate find_all sweeps (img, picture/source,
+        # background styles, data-src attrs) that each walk every node
+        for element in soup.find_all(True):
+            tag = element.name
+
+            if tag == 'img':
+                # Read the attrs dict once and probe it directly rather
+                # than going through a Tag.get call per attribute
+                attrs = element.attrs
+                for attr in _SRC_ATTRS:
+                    src = attrs.get(attr)
+                    if src and is_image_url(src):
+                        add_url(_absolutize(src))
+                        break  # Only add one source per img tag
+                continue
+
+            if tag == 'source':
+                srcset = element.get('srcset')
                 if srcset:
                     # Extract URLs from srcset (format: "url1 1x, url2 2x")
-                    urls = re.findall(r'([^\s,]+)', srcset)
+                    urls = _SRCSET_URL_RE.findall(srcset)
                     for url in urls:
-                        if is_image_url(url):
-                            if url.startswith('//'):
-                                url = 'https:' + url
-                            elif url.startswith('/'):
-                                url = 'https://www.zillow.com' + url
-                            image_urls.append(url)
-        
-        # Look for background images in style attributes
-        elements_with_bg = soup.find_all(attrs={'style': re.compile(r'background-image')})
-        for element in elements_with_bg:
-            style = element.get('style', '')
-            bg_match = re.search(r'background-image:\s*url\(["\']?([^"\']+)["\']?\)', style)
-            if bg_match:
-                url = bg_match.group(1)
-                if is_image_url(url):
-                    if url.startswith('//'):
-                        url = 'https:' + url
-                    elif url.startswith('/'):
-                        url = 'https://www.zillow.com' + url
-                    image_urls.append(url)
-        
-        # Look for image URLs in data attributes and JavaScript
-        all_elements = soup.find_all(attrs={'data-src': True})
-        for element in all_elements:
+                        if url not in seen and is_image_url(url):
+                            add_url(_absolutize(url))
+                continue
+
+            # Background images in style attributes
+            style = element.get('style')
+            if style and 'background-image' in style:
+                bg_match = _BG_URL_RE.search(style)
+                if bg_match:
+                    url = bg_match.group(1)
+                    if url not in seen and is_image_url(url):
+                        add_url(_absolutize(url))
+
+            # Image URLs in data attributes
             data_src = element.get('data-src')
-            if data_src and is_image_url(data_src):
-                if data_src.startswith('//'):
-                    data_src = 'https:' + data_src
-                elif data_src.startswith('/'):
-                    data_src = 'https://www.zillow.com' + data_src
-                image_urls.append(data_src)
-        
+            if data_src and data_src not in seen and is_image_url(data_src):
+                add_url(_absolutize(data_src))
+
         # Search for Zillow photo URLs in the raw HTML content - focus on property photos
-        zillow_photo_patterns = [
-            r'https://photos\.zillowstatic\.com/fp/([a-f0-9]{32})-cc_ft_\d+\.(jpg|webp|png)',
-            r'https://photos\.zillowstatic\.com/fp/([a-f0-9]{32})-o_a\.(jpg|webp|png)',
-            r'https://photos\.zillowstatic\.com/fp/([a-f0-9]{32})-r_b\.(jpg|webp|png)',
-            r'https://photos\.zillowstatic\.com/fp/([a-f0-9]{32})-p_d\.(jpg|webp|png)',
-            r'https://photos\.zillowstatic\.com/fp/([a-f0-9]{32})-p_i\.(jpg|webp|png)'
-        ]
-        
-        for pattern in zillow_photo_patterns:
-            found_matches = re.findall(pattern, html_content)
+        for pattern in _ZPHOTO_PATTERNS:
+            found_matches = pattern.findall(html_content)
             for match in found_matches:
                 base_id, extension = match
                 # Try to get the highest resolution version
                 full_url = f"https://photos.zillowstatic.com/fp/{base_id}-cc_ft_1536.{extension}"
-                image_urls.append(full_url)
+                add_url(full_url)
         
         # Filter to only property images and remove duplicates
         property_images = [url for url in image_urls if is_property_image(url)]
@@ -609,70 +805,31 @@ def filter_unique_images(image_urls):
         list: List of unique image URLs (highest resolution only)
     """
     try:
-        # Group images by their base identifier (before the resolution suffix)
-        image_groups = {}
-        
+        # Single pass mapping base id -> (resolution, url); keeping only
+        # the current best avoids materializing per-group lists and a
+        # second resolution-parsing sweep over each group
+        best = {}
+
         for url in image_urls:
             # Extract the base identifier from Zillow URLs
             # Example: https://photos.zillowstatic.com/fp/abc123-cc_ft_768.jpg -> abc123
-            base_match = re.search(r'/([a-f0-9]{32})-cc_ft_\d+\.(jpg|webp|png)', url)
+            base_match = _BASE_ID_RE.search(url)
             if base_match:
-                base_id = base_match.group(1)
-                if base_id not in image_groups:
-                    image_groups[base_id] = []
-                image_groups[base_id].append(url)
+                res_match = _RES_RE.search(url)
+                resolution = int(res_match.group(1)) if res_match else 0
+                key = base_match.group(1)
+                current = best.get(key)
+                if current is None or resolution > current[0]:
+                    best[key] = (resolution, url)
             else:
                 # For non-Zillow URLs, treat each as unique
-                image_groups[url] = [url]
-        
-        # For each group, select the highest resolution image
-        unique_images = []
-        for base_id, urls in image_groups.items():
-            if len(urls) == 1:
-                # Single image, use it
-                unique_images.append(urls[0])
-            else:
-                # Multiple resolutions, find the highest
-                best_url = select_highest_resolution(urls)
-                unique_images.append(best_url)
-        
-        return unique_images
-        
-    except Exception as e:
-        print(f"Error filtering unique images: {e}")
-        return list(set(image_urls))  # Fallback to simple deduplication
+                best.setdefault(url, (0, url))
 
+        return [url for _, url in best.values()]
 
-def select_highest_resolution(urls):
-    """
-    Select the highest resolution image from a list of URLs.
-    
-    Args:
-        urls (list): List of image URLs with different resolutions
-        
-    Returns:
-        str: URL of the highest resolution image
-    """
-    try:
-        # Extract resolution numbers from URLs
-        url_resolutions = []
-        for url in urls:
-            # Look for resolution pattern like -cc_ft_768.jpg
-            res_match = re.search(r'-cc_ft_(\d+)\.', url)
-            if res_match:
-                resolution = int(res_match.group(1))
-                url_resolutions.append((resolution, url))
-            else:
-                # If no resolution found, assume it's a base image
-                url_resolutions.append((0, url))
-        
-        # Sort by resolution (descending) and return the highest
-        url_resolutions.sort(key=lambda x: x[0], reverse=True)
-        return url_resolutions[0][1]
-        
     except Exception as e:
-        print(f"Error selecting highest resolution: {e}")
-        return urls[0]  # Fallback to first URL
+        print(f"Error filtering unique images: {e}")
+        return list(set(image_urls))  # Fallback to simple deduplication
 
 
 def print_image_urls(image_urls):
@@ -693,19 +850,21 @@ def print_image_urls(image_urls):
     print("-" * 50)
 
 
-def extract_property_details(html_content, url):
+def extract_property_details(html_content, url, soup=None):
     """
     Extract property details from the HTML content.
-    
+
     Args:
         html_content (str): HTML content of the page
         url (str): The original URL
-        
+        soup (BeautifulSoup): Optional pre-parsed soup to reuse
+
     Returns:
         dict: Property details including address, bedrooms, bathrooms, etc.
     """
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
+        if soup is None:
+            soup = BeautifulSoup(html_content, _BS_PARSER)
         details = {
             'address': 'Unknown Address',
             'city': 'Unknown',
@@ -721,7 +880,7 @@ def extract_property_details(html_content, url):
         }
         
         # Try to extract from JSON data first
-        json_data = extract_json_from_page(html_content)
+        json_data = extract_json_from_page(html_content, soup)
         if json_data:
             # Look for property details in JSON
             def search_property_details(data, path=""):
@@ -780,7 +939,7 @@ def extract_property_details(html_content, url):
         structured_data = soup.find_all('script', type='application/ld+json')
         for script in structured_data:
             try:
-                data = json.loads(script.string)
+                data = _json_loads(script.string)
                 if isinstance(data, dict) and data.get('@type') == 'RealEstateAgent':
                     # Extract property details from structured data
                     if 'address' in data:
@@ -1085,18 +1244,22 @@ Examples:
         print("Failed to fetch the page. Please check the URL and try again.")
         sys.exit(1)
     
+    # Parse the page once and share the soup across all extractors;
+    # re-parsing a multi-MB listing page dominates CPU otherwise
+    soup = BeautifulSoup(html_content, _BS_PARSER)
+
     # Extract property details
     print("Extracting property details...")
-    property_details = extract_property_details(html_content, args.url)
-    
+    property_details = extract_property_details(html_content, args.url, soup)
+
     # Extract images from HTML directly (more reliable for property photos)
     print("Extracting property images from page...")
-    image_urls = extract_images_from_html(html_content)
-    
+    image_urls = extract_images_from_html(html_content, soup)
+
     # If no images found in HTML, try JSON as fallback
     if not image_urls:
         print("No images found in HTML, trying JSON extraction...")
-        json_data = extract_json_from_page(html_content)
+        json_data = extract_json_from_page(html_content, soup)
         if json_data:
             print("Parsing image URLs from JSON...")
             image_urls = extract_image_urls(json_data)
@@ -1154,12 +1317,14 @@ def generate_listing_id(url):
         str: Unique listing identifier
     """
     # Extract ZPID from URL
-    zpid_match = re.search(r'/(\d+)_zpid/', url)
+    zpid_match = _ZPID_RE.search(url)
     if zpid_match:
         return f"zpid_{zpid_match.group(1)}"
     
-    # Fallback to hash of URL
-    return f"listing_{hash(url) % 1000000:06d}"
+    # Fallback to a hash of the URL. blake2b is stable across processes,
+    # unlike the builtin hash() whose PYTHONHASHSEED randomization gave
+    # the same listing a different ID (and S3 prefix) every run
+    return f"listing_{hashlib.blake2b(url.encode('utf-8'), digest_size=6).hexdigest()}"
 
 
 if __name__ == "__main__":